@@ -0,0 +1,110 @@
+"""
+Micro-benchmarks for the parsing helpers in `timepro_timesheet.utils`,
+comparing them against the approaches they replace, plus end-to-end
+timings of `Timesheet.json()` on a realistic month-long timesheet.
+
+    python benchmarks/bench_utils.py
+"""
+
+import timeit
+from datetime import date, datetime, timedelta
+
+from dateutil.parser import parse as dateparser
+from requests_html import HTML
+
+from pages import render_timesheet_page
+from timepro_timesheet.timesheet import Timesheet
+from timepro_timesheet.utils import (
+    convert_keys_to_dates,
+    convert_time_string_and_minutes_to_hours,
+    iter_date_series,
+    parse_date_string,
+)
+
+NUMBER = 20000
+TIME_VALUES = ["7.5", "8:00", "7:30", "8", "0.5", "4:15"]
+
+
+def original_generate_date_series(start_date, end_date):
+    # `generate_date_series` before it wrapped `iter_date_series`
+    days_diff = (end_date - start_date).days
+    return [start_date + timedelta(days=x) for x in range(0, days_diff + 1)]
+
+
+def original_convert_keys_to_dates(data):
+    # `convert_keys_to_dates` before it used `parse_date_string`
+    converted_data = {}
+    for k, d in data.items():
+        key = k
+        if not isinstance(key, date) and not isinstance(key, datetime):
+            key = dateparser(key)
+        converted_data[key] = d
+    return converted_data
+
+
+def bench(name, stmt, number=NUMBER):
+    seconds = min(timeit.repeat(stmt, number=number, repeat=3))
+    print("{:<48} {:>8.2f} us/call".format(name, seconds / number * 1e6))
+    return seconds
+
+
+def compare(name, baseline, candidate, number=NUMBER):
+    baseline_seconds = bench("{} (before)".format(name), baseline, number)
+    candidate_seconds = bench("{} (after)".format(name), candidate, number)
+    print("{:<48} {:>8.1f}x\n".format("speedup", baseline_seconds / candidate_seconds))
+
+
+def main():
+    uncached_conversion = convert_time_string_and_minutes_to_hours.__wrapped__
+    start_date, end_date = date(2018, 1, 1), date(2018, 12, 31)
+
+    compare(
+        "parse %d-%b-%Y",
+        lambda: dateparser("06-Aug-2018"),
+        lambda: parse_date_string("06-Aug-2018"),
+    )
+    compare(
+        "parse %Y-%m-%d",
+        lambda: dateparser("2018-08-06"),
+        lambda: parse_date_string("2018-08-06"),
+    )
+    compare(
+        "convert time values",
+        lambda: [uncached_conversion(v) for v in TIME_VALUES],
+        lambda: [convert_time_string_and_minutes_to_hours(v) for v in TIME_VALUES],
+    )
+    compare(
+        "iterate year-long series",
+        lambda: [d for d in original_generate_date_series(start_date, end_date)],
+        lambda: [d for d in iter_date_series(start_date, end_date)],
+        number=NUMBER // 10,
+    )
+    compare(
+        "first date of year-long series",
+        lambda: original_generate_date_series(start_date, end_date)[0],
+        lambda: next(iter_date_series(start_date, end_date)),
+    )
+
+    month_data = dict(
+        (d.strftime("%Y-%m-%d"), [])
+        for d in iter_date_series(date(2018, 8, 1), date(2018, 8, 31))
+    )
+    compare(
+        "convert_keys_to_dates (31 days)",
+        lambda: original_convert_keys_to_dates(month_data),
+        lambda: convert_keys_to_dates(month_data),
+        number=NUMBER // 100,
+    )
+
+    # End-to-end: 20 rows x 31 days parsed from HTML, as returned by the API
+    html = HTML(html=render_timesheet_page(rows=20, days=31))
+    bench("Timesheet(html=...) (20 rows x 31 days)", lambda: Timesheet(html=html), 20)
+    bench(
+        "Timesheet(html=...).json() (20 rows x 31 days)",
+        lambda: Timesheet(html=html).json(),
+        20,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Load test concurrent `TimesheetAPI` usage against a local stand-in for the
+timesheets.com.au server.
+
+Each simulated user repeatedly runs login -> get_timesheet -> post_timesheet
+with a fresh `TimesheetAPI`. Users run concurrently in a thread pool or a
+process pool, and the test is repeated for each worker count to give a
+scaling curve of throughput, latency percentiles and peak RSS. Each
+configuration runs in a fresh process, so peak RSS covers that run only.
+
+    python benchmarks/loadtest.py --mode thread process --workers 1 2 4 8
+
+The stand-in server runs in separate processes sharing one port (via
+`SO_REUSEPORT` where available), so it doesn't compete with thread-pool
+workers for the GIL. Server CPU utilisation is reported for each run; if it
+approaches 100% the server, not the client, is the bottleneck.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from pages import START_DATE, render_timecodes_page, render_timesheet_page
+from timepro_timesheet.api import TimesheetAPI
+
+LOGIN_PAGE = '<html><body><input name="UserContextID" value="ctx"></body></html>'
+VIEW_TIMESHEET_PAGE = '<html><body><input name="StaffID" value="42"></body></html>'
+SAVED_PAGE = "<html><body>Saved</body></html>"
+
+
+def create_handler(rows, days, cpu_time):
+    timecodes_page = render_timecodes_page(rows).encode("utf-8")
+    timesheet_page = render_timesheet_page(rows, days).encode("utf-8")
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, as with the real server
+        # Headers and body are written separately, avoid delayed ACK stalls
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            form = parse_qs(self.rfile.read(length).decode("utf-8"))
+            if self.path.endswith("/tplogin/default.asp"):
+                body = LOGIN_PAGE.encode("utf-8")
+            elif self.path.endswith("/ViewTimeSheet.asp"):
+                body = VIEW_TIMESHEET_PAGE.encode("utf-8")
+            elif "Save" in form:
+                body = SAVED_PAGE.encode("utf-8")
+            elif form.get("Mode") == ["Day"]:
+                body = timecodes_page
+            else:
+                body = timesheet_page
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            # CPU time of this server process, read by the load test
+            cpu_time.value = time.process_time()
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+class ReusePortHTTPServer(ThreadingHTTPServer):
+    def server_bind(self):
+        # Let several server processes listen on the same port
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def serve(rows, days, port, cpu_time, port_queue):
+    server_class = (
+        ReusePortHTTPServer if hasattr(socket, "SO_REUSEPORT") else ThreadingHTTPServer
+    )
+    server = server_class(("127.0.0.1", port), create_handler(rows, days, cpu_time))
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(rows, days, processes=1):
+    """
+    Start `processes` server processes on one port, returning the processes,
+    shared values holding the CPU time of each and the server's base URL.
+    """
+    if not hasattr(socket, "SO_REUSEPORT"):
+        processes = 1
+    port_queue = multiprocessing.Queue()
+    port = 0  # the first process picks a free port, the rest share it
+    servers, cpu_times = [], []
+    for _ in range(processes):
+        cpu_time = multiprocessing.RawValue("d", 0.0)
+        process = multiprocessing.Process(
+            target=serve, args=(rows, days, port, cpu_time, port_queue), daemon=True
+        )
+        process.start()
+        port = port_queue.get(timeout=10)
+        servers.append(process)
+        cpu_times.append(cpu_time)
+    return servers, cpu_times, "http://127.0.0.1:{}".format(port)
+
+
+def create_api(base_url):
+    api = TimesheetAPI()
+    api.LOGIN_URL = base_url + "/tplogin/default.asp"
+    api.VIEW_TIMESHEET_URL = base_url + "/tp60/ViewTimeSheet.asp"
+    api.INPUT_TIME_URL = base_url + "/tp60/InputTime.asp"
+    return api
+
+
+def peak_rss():
+    """
+    Peak resident set size of the current process, in bytes.
+    """
+    if resource is None:
+        return None
+    # Linux reports kilobytes, macOS reports bytes
+    scale = 1 if os.uname().sysname == "Darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def run_user(base_url, iterations):
+    """
+    Run login -> get_timesheet -> post_timesheet `iterations` times, returning
+    the process ID, its peak RSS and a list of per-step timings in seconds.
+    """
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        api = create_api(base_url)
+        api.login(username="user", password="password", customer_id="CUST")
+        t1 = time.perf_counter()
+        timesheet = api.get_timesheet(
+            start_date=START_DATE, end_date=START_DATE + timedelta(days=6)
+        )
+        t2 = time.perf_counter()
+        api.post_timesheet(timesheet)
+        t3 = time.perf_counter()
+        api.session.close()
+        timings.append(
+            {"login": t1 - t0, "get": t2 - t1, "post": t3 - t2, "total": t3 - t0}
+        )
+    return os.getpid(), peak_rss(), timings
+
+
+def percentile(values, p):
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, int(round(p / 100 * len(values))) - 1))
+    return values[index]
+
+
+def run_load_test(base_url, mode, workers, iterations, server_cpu_times=()):
+    executor_class = ThreadPoolExecutor if mode == "thread" else ProcessPoolExecutor
+    server_cpu_started = sum(v.value for v in server_cpu_times)
+    with executor_class(max_workers=workers) as executor:
+        started = time.perf_counter()
+        futures = [
+            executor.submit(run_user, base_url, iterations) for _ in range(workers)
+        ]
+        results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - started
+    server_cpu = sum(v.value for v in server_cpu_times) - server_cpu_started
+
+    timings = [t for _, _, user_timings in results for t in user_timings]
+    rss_by_pid = {}
+    for pid, rss, _ in results:
+        rss_by_pid[pid] = max(rss or 0, rss_by_pid.get(pid, 0))
+    result = {
+        "mode": mode,
+        "workers": workers,
+        "cycles": len(timings),
+        "seconds": elapsed,
+        "throughput": len(timings) / elapsed,
+        # Sum across worker processes; threads share one process
+        "peak_rss_mb": sum(rss_by_pid.values()) / 1024**2,
+        "server_cpu_seconds": server_cpu,
+        # Average utilisation of the server processes, each limited to one CPU
+        # by the GIL
+        "server_cpu_percent": (
+            100 * server_cpu / (elapsed * len(server_cpu_times))
+            if server_cpu_times
+            else None
+        ),
+    }
+    for step in ("login", "get", "post", "total"):
+        values = [t[step] * 1000 for t in timings]
+        for p in (50, 95, 99):
+            result["{}_p{}_ms".format(step, p)] = percentile(values, p)
+    return result
+
+
+def _run_load_test_process(result_queue, *args):
+    result_queue.put(run_load_test(*args))
+
+
+def run_isolated_load_test(*args):
+    """
+    Call `run_load_test` in a fresh process so that peak RSS isn't carried
+    over from earlier runs.
+    """
+    result_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_run_load_test_process, args=(result_queue,) + args
+    )
+    process.start()
+    try:
+        while True:
+            try:
+                return result_queue.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    raise RuntimeError(
+                        "load test process exited with code {}".format(process.exitcode)
+                    )
+    finally:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test TimesheetAPI against a local stand-in server"
+    )
+    parser.add_argument(
+        "--mode",
+        nargs="+",
+        choices=["thread", "process"],
+        default=["thread", "process"],
+        help="Worker pool type(s) to test",
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+        help="Concurrent simulated users (one per worker) to test",
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=20,
+        help="login/get/post cycles per simulated user (default: 20)",
+    )
+    parser.add_argument(
+        "--rows", type=int, default=10, help="Timesheet rows served (default: 10)"
+    )
+    parser.add_argument(
+        "--days", type=int, default=7, help="Timesheet days served (default: 7)"
+    )
+    parser.add_argument(
+        "--server-processes",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Stand-in server processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Output results as JSON lines"
+    )
+    args = parser.parse_args()
+
+    servers, server_cpu_times, base_url = start_server(
+        args.rows, args.days, args.server_processes
+    )
+    try:
+        if not args.json:
+            print(
+                "{} CPUs, {} server processes, {} rows x {} days, "
+                "{} cycles per user".format(
+                    os.cpu_count(),
+                    len(servers),
+                    args.rows,
+                    args.days,
+                    args.iterations,
+                )
+            )
+            print(
+                "{:<8} {:>7} {:>8} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+                    "mode",
+                    "workers",
+                    "cycles/s",
+                    "p50 ms",
+                    "p95 ms",
+                    "p99 ms",
+                    "get p50",
+                    "RSS MB",
+                    "srv CPU%",
+                )
+            )
+        for mode in args.mode:
+            for workers in args.workers:
+                result = run_isolated_load_test(
+                    base_url, mode, workers, args.iterations, server_cpu_times
+                )
+                if args.json:
+                    print(json.dumps(result), flush=True)
+                    continue
+                print(
+                    "{mode:<8} {workers:>7} {throughput:>8.1f} {total_p50_ms:>9.1f} "
+                    "{total_p95_ms:>9.1f} {total_p99_ms:>9.1f} {get_p50_ms:>9.1f} "
+                    "{peak_rss_mb:>9.1f} {server_cpu_percent:>9.1f}".format(**result),
+                    flush=True,
+                )
+    finally:
+        for server in servers:
+            server.terminate()
+
+
+if __name__ == "__main__":
+    main()
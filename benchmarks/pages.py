@@ -0,0 +1,53 @@
+"""
+Render stand-in timesheets.com.au pages for the benchmarks.
+"""
+
+from datetime import date, timedelta
+
+START_DATE = date(2018, 8, 6)
+
+
+def render_timecodes_page(rows):
+    customers = "".join(
+        '<option value="C{0}">Customer {0}</option>'.format(i) for i in range(rows)
+    )
+    projects = "".join(
+        "AddProjectEntry('C{0}','P{0}','P{0}{{:}}1','Project {0}',1)\n".format(i)
+        for i in range(rows)
+    )
+    tasks = "".join(
+        "AddTaskEntry('P{0}','T{0}','Task {0}')\n".format(i) for i in range(rows)
+    )
+    return (
+        '<html><body><select name="CustomerCode_0_0"><option value=""></option>'
+        "{}</select><script>{}{}</script></body></html>".format(
+            customers, projects, tasks
+        )
+    )
+
+
+def render_timesheet_page(rows, days):
+    inputs = [
+        '<input name="InputRows" value="{}">'.format(rows + 1),
+        '<input name="StartDate" value="{}">'.format(START_DATE.strftime("%d-%b-%Y")),
+        '<input name="EndDate" value="{}">'.format(
+            (START_DATE + timedelta(days=days - 1)).strftime("%d-%b-%Y")
+        ),
+    ]
+    for row_id in range(rows):
+        inputs.append(
+            '<select name="CustomerCode_{0}_0"><option value="C{0}" selected>'
+            "Customer {0}</option></select>".format(row_id)
+        )
+        inputs.append('<input name="Project_{0}_0" value="P{0}{{:}}1">'.format(row_id))
+        inputs.append('<input name="Task_{0}_0" value="T{0}">'.format(row_id))
+        for column_id in range(days):
+            inputs.append(
+                '<input name="FinishTime_{}_{}" value="7:30">'.format(row_id, column_id)
+            )
+            inputs.append(
+                '<input name="Description_{}_{}" value="Work">'.format(
+                    row_id, column_id
+                )
+            )
+    return "<html><body><form>{}</form></body></html>".format("".join(inputs))
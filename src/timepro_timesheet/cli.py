@@ -1,5 +1,6 @@
 import argparse
 import json
+import logging
 import sys
 from datetime import date
 
@@ -7,7 +8,9 @@ from dateutil.parser import parse as dateparser
 from dateutil.relativedelta import relativedelta, MO, FR
 
 from .api import TimesheetAPI
+from .report import TimesheetReport
 from .timesheet import Timesheet
+from .watch import TimesheetWatcher, split_period_into_weeks
 
 TODAY = date.today()
 
@@ -53,52 +56,50 @@ class TimesheetCLI:
         )
         return parser
 
-    def get(self, arg_options):
-        parser = self._create_parser(
-            description="Get timesheet data from Intertec TimePro"
-        )
-        get_parameters = parser.add_argument_group("filter options")
-        get_parameters.add_argument(
+    def _add_date_arguments(self, parser):
+        date_parameters = parser.add_argument_group("filter options")
+        date_parameters.add_argument(
             "--start",
             dest="start_date",
             metavar="START_DATE",
             help="Start date of timesheet period",
         )
-        get_parameters.add_argument(
+        date_parameters.add_argument(
             "--end",
             dest="end_date",
             metavar="END_DATE",
             help="End date of timesheet period",
         )
-        get_parameters.add_argument(
+        date_parameters.add_argument(
             "--current-week",
             dest="current_week",
             action="store_true",
             help="Get current week's timesheet",
         )
-        get_parameters.add_argument(
+        date_parameters.add_argument(
             "--current-month",
             dest="current_month",
             action="store_true",
             help="Get current month's timesheet",
         )
-        get_parameters.add_argument(
+        date_parameters.add_argument(
             "--last-week",
             dest="last_week",
             action="store_true",
             help="Get last week's timesheet",
         )
-        get_parameters.add_argument(
+        date_parameters.add_argument(
             "--last-month",
             dest="last_month",
             action="store_true",
             help="Get last month's timesheet",
         )
+        return date_parameters
 
+    def _parse_date_arguments(self, args):
         # If Saturday or Sunday, treat "last week" as the week just been
         week_offset = 1 if TODAY.weekday() >= 5 else 0
 
-        args = parser.parse_args(arg_options)
         if args.start_date and args.end_date:
             start_date = dateparser(args.start_date)
             end_date = dateparser(args.end_date)
@@ -120,13 +121,135 @@ class TimesheetCLI:
                 [TODAY + relativedelta(day=1), TODAY + relativedelta(weekday=MO(-1))]
             )
             end_date = TODAY + relativedelta(weekday=FR)
-        date_kwargs = dict(start_date=start_date, end_date=end_date)
+        return dict(start_date=start_date, end_date=end_date)
+
+    def get(self, arg_options):
+        parser = self._create_parser(
+            description="Get timesheet data from Intertec TimePro"
+        )
+        self._add_date_arguments(parser)
+        entry_parameters = parser.add_argument_group("entry filter options")
+        entry_parameters.add_argument(
+            "--customer-code",
+            dest="customer_code",
+            action="append",
+            help="Only include entries for this customer code (can be repeated)",
+        )
+        entry_parameters.add_argument(
+            "--project",
+            dest="project",
+            action="append",
+            help="Only include entries for this project code or PSID (can be repeated)",
+        )
+        entry_parameters.add_argument(
+            "--task",
+            dest="task",
+            action="append",
+            help="Only include entries for this task ID (can be repeated)",
+        )
+        args = parser.parse_args(arg_options)
+        date_kwargs = self._parse_date_arguments(args)
+        entry_filter = dict(
+            (k, v)
+            for k, v in [
+                ("customer", args.customer_code),
+                ("project", args.project),
+                ("task", args.task),
+            ]
+            if v
+        )
+        api = TimesheetAPI()
+        api.login(
+            customer_id=args.customer, username=args.username, password=args.password
+        )
+        timesheet = api.get_timesheet(**date_kwargs)
+        print(timesheet.json(filter=entry_filter))
+
+    def report(self, arg_options):
+        parser = self._create_parser(
+            description="Summarise timesheet hours from Intertec TimePro"
+        )
+        self._add_date_arguments(parser)
+        report_parameters = parser.add_argument_group("report options")
+        report_parameters.add_argument(
+            "--group-by",
+            dest="group_by",
+            action="append",
+            choices=TimesheetReport.KEY_COLUMNS,
+            help="Column to group hours by (can be repeated)",
+        )
+        report_parameters.add_argument(
+            "--period",
+            dest="period",
+            choices=TimesheetReport.PERIODS,
+            help="Group hours by day, week, month or year",
+        )
+        args = parser.parse_args(arg_options)
+        date_kwargs = self._parse_date_arguments(args)
         api = TimesheetAPI()
         api.login(
             customer_id=args.customer, username=args.username, password=args.password
         )
         timesheet = api.get_timesheet(**date_kwargs)
-        print(timesheet.json())
+        report = TimesheetReport.from_timesheets([timesheet], staff=api.staff_id)
+        records = report.group_by(args.group_by or [], period=args.period)
+        for record in records:
+            for k in TimesheetReport.PERIODS + ("date",):
+                if k in record:
+                    record[k] = record[k].strftime("%Y-%m-%d")
+        print(json.dumps(records, indent=2))
+
+    def watch(self, arg_options):
+        parser = self._create_parser(
+            description="Watch timesheet data in Intertec TimePro for changes"
+        )
+        self._add_date_arguments(parser)
+        watch_parameters = parser.add_argument_group("watch options")
+        watch_parameters.add_argument(
+            "--interval",
+            dest="interval",
+            type=float,
+            default=300,
+            help="Seconds between polls of a changing timesheet period (default: 300)",
+        )
+        watch_parameters.add_argument(
+            "--max-interval",
+            dest="max_interval",
+            type=float,
+            default=3600,
+            help="Maximum seconds between polls of an unchanged period (default: 3600)",
+        )
+        args = parser.parse_args(arg_options)
+        date_kwargs = self._parse_date_arguments(args)
+        api = TimesheetAPI()
+
+        def login():
+            api.login(
+                customer_id=args.customer,
+                username=args.username,
+                password=args.password,
+            )
+
+        login()
+        watcher = TimesheetWatcher(
+            api,
+            periods=split_period_into_weeks(**date_kwargs),
+            interval=args.interval,
+            max_interval=args.max_interval,
+            relogin=login,
+        )
+
+        # Poll failures are logged to stderr, events are written to stdout
+        logging.basicConfig(level=logging.WARNING)
+
+        # Output one JSON event per line (NDJSON)
+        def print_event(event):
+            print(json.dumps(event), flush=True)
+
+        try:
+            watcher.run(print_event)
+        except KeyboardInterrupt:
+            pass
 
     def post(self, arg_options):
         parser = self._create_parser(
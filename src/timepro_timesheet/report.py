@@ -0,0 +1,270 @@
+from datetime import date, timedelta
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, fall back to pure Python aggregation
+    np = None
+
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class TimesheetReport:
+    """
+    Columnar table of timesheet entries (one row per staff/day/timecode) that
+    supports group-by, sum and pivot operations. Aggregation is NumPy-backed
+    when NumPy is installed.
+
+    Dates are stored as ordinals and staff/customer/project/task as integer
+    codes into a table of unique values, so grouping only works on integers.
+    """
+
+    COLUMNS = ("date", "staff", "customer", "project", "task", "hours")
+    KEY_COLUMNS = COLUMNS[:-1]
+    CATEGORY_COLUMNS = ("staff", "customer", "project", "task")
+    PERIODS = ("day", "week", "month", "year")
+
+    def __init__(self):
+        self._columns = dict((c, []) for c in self.COLUMNS)
+        self._values = dict((c, []) for c in self.CATEGORY_COLUMNS)
+        self._codes = dict((c, {}) for c in self.CATEGORY_COLUMNS)
+        self._arrays = {}  # cached NumPy arrays of columns, reset on insert
+
+    def __len__(self):
+        return len(self._columns["hours"])
+
+    @classmethod
+    def from_timesheets(cls, timesheets, staff=None):
+        """
+        Create a report from an iterable of timesheets, or a dictionary of
+        timesheets (or lists of timesheets) keyed by staff ID.
+        """
+        report = cls()
+        if isinstance(timesheets, dict):
+            for staff_id, staff_timesheets in timesheets.items():
+                if not isinstance(staff_timesheets, (list, tuple)):
+                    staff_timesheets = [staff_timesheets]
+                for timesheet in staff_timesheets:
+                    report.add_timesheet(timesheet, staff=staff_id)
+        else:
+            for timesheet in timesheets:
+                report.add_timesheet(timesheet, staff=staff)
+        return report
+
+    def _encode(self, column, value):
+        code = self._codes[column].get(value)
+        if code is None:
+            code = self._codes[column][value] = len(self._values[column])
+            self._values[column].append(value)
+        return code
+
+    def add_timesheet(self, timesheet, staff=None):
+        """
+        Append the entries of a timesheet to the report.
+        """
+        if timesheet.period() is None:
+            return
+        staff_code = self._encode("staff", staff)
+        # Bind the column appends once, this loop runs for every cell
+        (
+            append_date,
+            append_staff,
+            append_customer,
+            append_project,
+            append_task,
+            append_hours,
+        ) = (self._columns[c].append for c in self.COLUMNS)
+        current_row_id = codes = None
+        for row_id, dt, cell in timesheet.iter_cells():
+            if not cell["hours"]:
+                continue
+            if row_id != current_row_id:
+                # Encode customer/project/task once per row
+                current_row_id = row_id
+                project = cell["project"]
+                # Report on `project_code` rather than `project_psid` where possible
+                project = timesheet.lookup_project(project).get("project_code", project)
+                codes = (
+                    self._encode("customer", cell["customer"]),
+                    self._encode("project", project),
+                    self._encode("task", cell["task"]),
+                )
+            append_date(dt.toordinal())
+            append_hours(cell["hours"])
+            append_staff(staff_code)
+            append_customer(codes[0])
+            append_project(codes[1])
+            append_task(codes[2])
+        self._arrays = {}
+
+    def _array(self, column):
+        if column not in self._arrays:
+            dtype = float if column == "hours" else np.int64
+            self._arrays[column] = np.asarray(self._columns[column], dtype=dtype)
+        return self._arrays[column]
+
+    def _validate_key(self, key):
+        if key not in self.KEY_COLUMNS + self.PERIODS:
+            raise ValueError(
+                "expected key to be one of {}; got {}".format(
+                    ", ".join(self.KEY_COLUMNS + self.PERIODS), repr(key)
+                )
+            )
+        return "day" if key == "date" else key
+
+    def _key_codes(self, key):
+        """
+        Return integer codes for a key column, along with the values they
+        index. Codes are assigned in sorted order of the values.
+        """
+        if key in self.PERIODS:
+            ordinals = _period_ordinals(self._array("date"), key)
+            uniques, codes = np.unique(ordinals, return_inverse=True)
+            values = np.empty(len(uniques), dtype=object)
+            values[:] = [date.fromordinal(int(o)) for o in uniques]
+            return codes.ravel(), values
+        values = self._values[key]
+        order = sorted(range(len(values)), key=lambda i: _sort_value(values[i]))
+        ranks = np.empty(len(order), dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+        sorted_values = np.empty(len(values), dtype=object)
+        sorted_values[:] = [values[i] for i in order]
+        return ranks[self._array(key)], sorted_values
+
+    def _key_values(self, key):
+        """
+        Return a list of the values of a key column (pure Python).
+        """
+        if key in self.PERIODS:
+            buckets = {}
+            column = []
+            for ordinal in self._columns["date"]:
+                bucket = buckets.get(ordinal)
+                if bucket is None:
+                    bucket = buckets[ordinal] = period_start(
+                        date.fromordinal(ordinal), key
+                    )
+                column.append(bucket)
+            return column
+        values = self._values[key]
+        return [values[code] for code in self._columns[key]]
+
+    def _aggregate(self, keys):
+        """
+        Sum hours for each unique combination of values across `keys`,
+        returning a dictionary of tuples to total hours, ordered by key.
+        """
+        keys = [self._validate_key(k) for k in keys]
+        if not len(self):
+            return {}
+        if not keys:
+            return {(): float(sum(self._columns["hours"]))}
+        if np is None:
+            totals = {}
+            key_columns = [self._key_values(k) for k in keys]
+            for key, value in zip(zip(*key_columns), self._columns["hours"]):
+                totals[key] = totals.get(key, 0) + value
+            return dict((k, float(totals[k])) for k in sorted(totals, key=_sort_key))
+
+        # Combine the sorted codes of each key into a single code per entry,
+        # the order of which matches the order of keys, then group and sum
+        codes, uniques = [], []
+        for key in keys:
+            key_codes, key_uniques = self._key_codes(key)
+            codes.append(key_codes)
+            uniques.append(key_uniques)
+        dims = tuple(len(u) for u in uniques)
+        combined = np.ravel_multi_index(codes, dims)
+        groups, inverse = np.unique(combined, return_inverse=True)
+        sums = np.bincount(
+            inverse.ravel(), weights=self._array("hours"), minlength=len(groups)
+        )
+        key_values = [u[c] for u, c in zip(uniques, np.unravel_index(groups, dims))]
+        return dict(zip(zip(*key_values), sums.tolist()))
+
+    def total(self):
+        """
+        Total hours across all entries in the report.
+        """
+        return self._aggregate([]).get((), 0.0)
+
+    def group_by(self, keys, period=None):
+        """
+        Sum hours by one or more columns. If `period` is given, entries are
+        also grouped by the start date of their day/week/month/year.
+        Returns a list of records sorted by key.
+        """
+        if isinstance(keys, str):
+            keys = [keys]
+        keys = list(keys)
+        if period:
+            keys.insert(0, _validate_period(period))
+        records = []
+        for key, hours in self._aggregate(keys).items():
+            record = dict(zip(keys, key))
+            record["hours"] = hours
+            records.append(record)
+        return records
+
+    def pivot(self, index, columns, period=None):
+        """
+        Sum hours into a nested dictionary of `index` -> `columns` -> hours.
+        `index` or `columns` may also be the name of a period.
+        """
+        if period:
+            _validate_period(period)
+            index = period if index == "date" else index
+            columns = period if columns == "date" else columns
+        table = {}
+        for (row, column), hours in self._aggregate([index, columns]).items():
+            table.setdefault(row, {})[column] = hours
+        return table
+
+
+def period_start(dt, period):
+    """
+    Return the first day of the period (day/week/month/year) containing `dt`.
+    Weeks start on Monday.
+    """
+    _validate_period(period)
+    if period == "day":
+        return dt
+    elif period == "week":
+        return dt - timedelta(days=dt.weekday())
+    elif period == "month":
+        return dt.replace(day=1)
+    return dt.replace(month=1, day=1)
+
+
+def _period_ordinals(ordinals, period):
+    """
+    Vectorised `period_start` over an array of date ordinals.
+    """
+    if period == "day":
+        return ordinals
+    elif period == "week":
+        # Ordinal 1 (0001-01-01) is a Monday
+        return ordinals - (ordinals - 1) % 7
+    unit = "datetime64[M]" if period == "month" else "datetime64[Y]"
+    days = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+    starts = days.astype(unit).astype("datetime64[D]").astype(np.int64)
+    return starts + EPOCH_ORDINAL
+
+
+def _validate_period(period):
+    if period not in TimesheetReport.PERIODS:
+        raise ValueError(
+            "expected period to be one of {}; got {}".format(
+                ", ".join(TimesheetReport.PERIODS), repr(period)
+            )
+        )
+    return period
+
+
+def _sort_value(value):
+    # Sort None (e.g. unknown staff) before other values without raising TypeError
+    return (value is not None, value if value is not None else "")
+
+
+def _sort_key(key):
+    return tuple(_sort_value(v) for v in key)
@@ -1,13 +1,14 @@
 import itertools
 import json
 import re
-
-from dateutil.parser import parse as dateparser
+from datetime import timedelta
 
 from .utils import (
-    generate_date_series,
+    iter_date_series,
     convert_keys_to_dates,
     convert_time_string_and_minutes_to_hours,
+    convert_to_datetime,
+    parse_date_string,
 )
 
 
@@ -23,6 +24,9 @@ class Timesheet:
     TIMESHEET_FIELD_PATTERN = (
         r"^(?P<entry_type>\w+)_(?P<row_id>\d+)_(?P<column_id>\d+)$"
     )
+    # Fields that hold a value per day (`column_id`), rather than per row
+    CELL_ENTRY_TYPES = ("FinishTime", "Description", "PBatch", "SBatch")
+    FILTER_KEYS = ("customer", "project", "task", "start_date", "end_date")
 
     def __init__(
         self,
@@ -36,6 +40,8 @@ class Timesheet:
         self._project_options = project_options or []
         self._task_options = task_options or []
         self._form_data = {}
+        self._field_index = None  # cached by `_index_fields()`
+        self._field_index_source = None
         self._html = html
         if html:
             self._form_data = self.extract_form_data_from_html(html)
@@ -68,58 +74,26 @@ class Timesheet:
         """
         Construct dictionary of timesheet entries, with row numbers as keys.
         """
-        entries = {}
-        for k, v in self._form_data.items():
-            m = re.match(self.TIMESHEET_FIELD_PATTERN, k)
-            if not m:
-                continue
-            entry_type, row_id, column_id = m.groups()
-            row_id, column_id = int(row_id), int(column_id)
-            entry = entries.get(row_id, {})
-            if entry_type == "Customer":
-                entry["customer"] = v
-            elif entry_type == "Project":
-                entry["project"] = v
-            elif entry_type == "Task":
-                entry["task"] = v
-            elif entry_type == "Description":
-                # TODO: Add descriptions to OrderedDict instead,
-                # zip with hours to ensure a complete list
-                descriptions = entry.get("descriptions", [])
-                descriptions.append((column_id, v))
-                entry["descriptions"] = descriptions
-            elif entry_type == "FinishTime":
-                times = entry.get("times", [])
-                hours = convert_time_string_and_minutes_to_hours(v) if v != "" else 0
-                times.append((column_id, hours))
-                entry["times"] = times
-            entries[row_id] = entry
-        # Process times into ordered (based on `column_id`) list of hours
-        for k in entries.copy().keys():
-            customer = entries[k].get("customer", "")
-            project = entries[k].get("project", "")
-            times = entries[k].get("times", [])
-            descriptions = entries[k].get("descriptions", [])
-            if times:
-                sorted_times = sorted(times, key=lambda t: t[0])
-                times = [t[1] for t in sorted_times]
-            if descriptions:
-                sorted_descriptions = sorted(descriptions, key=lambda t: t[0])
-                descriptions = [t[1] for t in sorted_descriptions]
-            # Remove rows with no data
-            if (customer == "" and project == "") or sum(times) == 0:
-                entries.pop(k)
-                continue
-            entries[k]["times"] = times
-            entries[k]["descriptions"] = descriptions
-        return entries
+        return dict(self.iter_rows())
 
     def count_entries(self):
         """
         Count number of timesheet entries. This should reconcile with the
         `InputRows` field from the form data.
         """
-        return len(self.row_entries().keys())
+        return sum(1 for _ in self.iter_rows())
+
+    def period(self):
+        """
+        Return the (start date, end date) of the timesheet, or `None` if it
+        has no period (e.g. the response didn't contain a timesheet).
+        """
+        if not self._form_data.get("StartDate"):
+            return None
+        return (
+            parse_date_string(self._form_data["StartDate"]),
+            parse_date_string(self._form_data["EndDate"]),
+        )
 
     def form_data(self):
         """
@@ -146,6 +120,365 @@ class Timesheet:
                     data[sbatch_key] = ""
         return data
 
+    def _iter_filtered_rows(self, filter=None):
+        """
+        Yield `row_id`, timecode fields (customer/project/task), sorted
+        `column_id`s and cells for each row matching `filter`. Filtering by
+        timecode happens before any hours are converted or looked up.
+        """
+        filter = dict(filter or {})
+        unknown_keys = set(filter) - set(self.FILTER_KEYS)
+        if unknown_keys:
+            raise ValueError(
+                "expected filter keys to be one of {}; got {}".format(
+                    ", ".join(self.FILTER_KEYS), ", ".join(sorted(unknown_keys))
+                )
+            )
+        timecode_filters = {}
+        for k in ("customer", "project", "task"):
+            values = filter.get(k)
+            if values is not None:
+                timecode_filters[k] = (
+                    {values} if isinstance(values, str) else set(values)
+                )
+        first_column, last_column = 0, None
+        if filter.get("start_date") or filter.get("end_date"):
+            timesheet_start = parse_date_string(self._form_data["StartDate"])
+            if filter.get("start_date"):
+                start_date = convert_to_datetime(filter["start_date"])
+                first_column = (start_date - timesheet_start).days
+            if filter.get("end_date"):
+                end_date = convert_to_datetime(filter["end_date"])
+                last_column = (end_date - timesheet_start).days
+
+        for row_id, _, row_fields, cells in self._split_form_data():
+            timecodes = {}
+            if "CustomerCode" in row_fields or "Customer" in row_fields:
+                timecodes["customer"] = (
+                    row_fields.get("CustomerCode") or row_fields.get("Customer") or ""
+                )
+            if "Project" in row_fields:
+                timecodes["project"] = row_fields["Project"]
+            if "Task" in row_fields:
+                timecodes["task"] = row_fields["Task"]
+            # Skip rows with no data
+            if not timecodes.get("customer") and not timecodes.get("project"):
+                continue
+            if not all(
+                self._match_timecode(k, timecodes.get(k), values)
+                for k, values in timecode_filters.items()
+            ):
+                continue
+            columns = sorted(
+                column_id
+                for column_id in cells
+                if column_id >= first_column
+                and (last_column is None or column_id <= last_column)
+            )
+            yield row_id, timecodes, columns, cells
+
+    @staticmethod
+    def _match_timecode(key, value, values):
+        if value in values:
+            return True
+        # Allow projects to be matched by `project_code` as well as `project_psid`
+        return key == "project" and value and value.split("{:}")[0] in values
+
+    def iter_rows(self, filter=None):
+        """
+        Lazily generate (row number, entry) tuples of timesheet entries, in
+        row order. See `iter_entries()` for the supported `filter` keys;
+        `times` and `descriptions` only cover the filtered dates.
+        """
+        for row_id, timecodes, columns, cells in self._iter_filtered_rows(filter):
+            times = [
+                cells[c]["FinishTime"] for c in columns if "FinishTime" in cells[c]
+            ]
+            times = [
+                convert_time_string_and_minutes_to_hours(v) if v != "" else 0
+                for v in times
+            ]
+            # Remove rows with no hours
+            if sum(times) == 0:
+                continue
+            entry = dict(timecodes)
+            entry["times"] = times
+            entry["descriptions"] = [
+                cells[c]["Description"] for c in columns if "Description" in cells[c]
+            ]
+            yield row_id, entry
+
+    def iter_cells(self, filter=None):
+        """
+        Lazily generate (row number, date, cell) tuples for each day of rows
+        with hours, in row and date order. Dates come from each cell's
+        column, so days missing from the form data don't shift later days.
+        Cells are dictionaries of the row's customer/project/task codes,
+        `hours` (0 if blank) and `description`. See `iter_entries()` for the
+        supported `filter` keys.
+        """
+        start_date = parse_date_string(self._form_data["StartDate"])
+        for row_id, timecodes, columns, cells in self._iter_filtered_rows(filter):
+            hours = [self._cell_hours(cells[c]) for c in columns]
+            # Skip rows with no hours
+            if not any(hours):
+                continue
+            customer = timecodes.get("customer") or ""
+            project = timecodes.get("project") or ""
+            task = timecodes.get("task") or ""
+            for column_id, value in zip(columns, hours):
+                cell = {
+                    "customer": customer,
+                    "project": project,
+                    "task": task,
+                    "hours": value,
+                    "description": cells[column_id].get("Description") or "",
+                }
+                yield row_id, start_date + timedelta(days=column_id), cell
+
+    def iter_entries(self, filter=None):
+        """
+        Lazily generate (date, entry) tuples for each day with hours, in row
+        order. Entries include customer/project/task details from the
+        timecode options. `filter` is an optional dictionary of:
+
+        - `customer`, `project`, `task`: a code (or collection of codes) to
+          match. Projects match on either `project_code` or `project_psid`.
+        - `start_date`, `end_date`: limit entries to a date range.
+        """
+        start_date = parse_date_string(self._form_data["StartDate"])
+        for _, timecodes, columns, cells in self._iter_filtered_rows(filter):
+            # Check description list is populated (missing/empty when reading historical timesheets)
+            has_descriptions = any("Description" in c for c in cells.values())
+            details = None
+            for column_id in columns:
+                cell = cells[column_id]
+                v = cell.get("FinishTime")
+                if v == "0" or not v:
+                    continue
+                hours = convert_time_string_and_minutes_to_hours(v)
+                if not hours:
+                    continue
+                entry = {"hours": hours}
+                if has_descriptions:
+                    entry["description"] = cell.get("Description", "")
+                # Lookup customer/project/task details once per row
+                if details is None:
+                    details = {}
+                    details.update(self.lookup_customer(timecodes.get("customer", "")))
+                    details.update(self.lookup_project(timecodes.get("project", "")))
+                    details.update(self.lookup_task(timecodes.get("task", "")))
+                entry.update(details)
+                yield start_date + timedelta(days=column_id), entry
+
+    def _index_fields(self):
+        """
+        Index timesheet field names by `row_id`, as a dictionary of lists of
+        (field name, entry type, `column_id`). The index is built once and
+        cached until the form data is replaced.
+        """
+        if self._field_index_source is not self._form_data:
+            index = {}
+            entry_types = {}  # memoise validity of the few distinct entry types
+            for k in self._form_data:
+                # Equivalent to matching `TIMESHEET_FIELD_PATTERN`, without
+                # the cost of a regex per field
+                parts = k.rsplit("_", 2)
+                if len(parts) != 3:
+                    continue
+                entry_type, row_id, column_id = parts
+                valid = entry_types.get(entry_type)
+                if valid is None:
+                    valid = entry_types[entry_type] = bool(
+                        entry_type.replace("_", "").isalnum()
+                    )
+                if not (valid and row_id.isdigit() and column_id.isdigit()):
+                    continue
+                row_id = int(row_id)
+                fields = index.get(row_id)
+                if fields is None:
+                    fields = index[row_id] = []
+                fields.append((k, entry_type, int(column_id)))
+            self._field_index = index
+            self._field_index_source = self._form_data
+        return self._field_index
+
+    def _split_form_data(self):
+        """
+        Lazily split form data into rows, in `row_id` order. Each row is a
+        tuple of `row_id`, customer/project/task key, row-level fields and a
+        dictionary of cell fields keyed by `column_id`.
+        """
+        form_data = self._form_data
+        index = self._index_fields()
+        for row_id in sorted(index):
+            row_fields, cells = {}, {}
+            for k, entry_type, column_id in index[row_id]:
+                if entry_type in self.CELL_ENTRY_TYPES:
+                    cells.setdefault(column_id, {})[entry_type] = form_data[k]
+                else:
+                    row_fields[entry_type] = form_data[k]
+            key = (
+                row_fields.get("CustomerCode") or row_fields.get("Customer") or "",
+                row_fields.get("Project") or "",
+                row_fields.get("Task") or "",
+            )
+            yield row_id, key, row_fields, cells
+
+    @staticmethod
+    def _cell_hours(cell):
+        value = cell.get("FinishTime")
+        if value in ("", "0", None):
+            return 0
+        return convert_time_string_and_minutes_to_hours(value)
+
+    @classmethod
+    def _merge_cells(cls, cell, other_cell):
+        """
+        Combine two cells for the same row and date, summing hours and
+        joining descriptions. If only one cell has hours, its hours and
+        description are kept as they are.
+        """
+        hours, other_hours = cls._cell_hours(cell), cls._cell_hours(other_cell)
+        if other_hours and not hours:
+            # Zero hours (e.g. "0") mustn't hide hours from the other cell
+            cell, other_cell, hours, other_hours = other_cell, cell, other_hours, hours
+        merged = dict(cell)
+        for k, v in other_cell.items():
+            if hours and k in ("FinishTime", "Description"):
+                continue
+            if k not in merged or merged[k] in ("", None):
+                merged[k] = v
+        if hours and other_hours:
+            merged["FinishTime"] = hours + other_hours
+            descriptions = [
+                c.get("Description") for c in (cell, other_cell) if c.get("Description")
+            ]
+            merged["Description"] = "; ".join(descriptions)
+        return merged
+
+    def _create_from_rows(self, start_date, end_date, rows, options_from=None):
+        """
+        Create a new timesheet from rows of (row-level fields, cells keyed by
+        `column_id`). Rows without hours are dropped and the remaining rows are
+        renumbered, so row IDs reconcile with `count_entries()` (`InputRows`).
+        Timecode option tables are shared with the source timesheet(s).
+        """
+        options_from = options_from or [self]
+        timesheet = Timesheet(
+            customer_options=next(
+                (t._customer_options for t in options_from if t._customer_options),
+                None,
+            ),
+            project_options=next(
+                (t._project_options for t in options_from if t._project_options),
+                None,
+            ),
+            task_options=next(
+                (t._task_options for t in options_from if t._task_options), None
+            ),
+        )
+        column_count = (end_date - start_date).days + 1
+        form_data = {
+            "StartDate": start_date.strftime("%d-%b-%Y"),
+            "EndDate": end_date.strftime("%d-%b-%Y"),
+        }
+        row_id = 0
+        for row_fields, cells in rows:
+            if not any(self._cell_hours(c) for c in cells.values()):
+                continue
+            f = "{}_{}_{}"
+            for entry_type, v in row_fields.items():
+                form_data[f.format(entry_type, row_id, 0)] = v
+            for column_id in range(column_count):
+                cell = cells.get(column_id, {})
+                form_data[f.format("FinishTime", row_id, column_id)] = cell.get(
+                    "FinishTime", ""
+                )
+                form_data[f.format("Description", row_id, column_id)] = cell.get(
+                    "Description", ""
+                )
+                for entry_type in ("PBatch", "SBatch"):
+                    if entry_type in cell:
+                        form_data[f.format(entry_type, row_id, column_id)] = cell[
+                            entry_type
+                        ]
+            row_id += 1
+        timesheet._form_data = form_data
+        return timesheet
+
+    def merge(self, *others):
+        """
+        Combine this timesheet with one or more other timesheets, covering the
+        combined period. Hours for the same customer/project/task on the same
+        date are summed, so overlapping timesheets are double-counted
+        (`t.merge(t)` doubles every hour).
+        """
+        timesheets = [t for t in (self,) + others if "StartDate" in t._form_data]
+        if not timesheets:
+            raise ValueError("expected at least one timesheet with a period to merge")
+        periods = [
+            (
+                parse_date_string(t._form_data["StartDate"]),
+                parse_date_string(t._form_data["EndDate"]),
+            )
+            for t in timesheets
+        ]
+        start_date = min(p[0] for p in periods)
+        end_date = max(p[1] for p in periods)
+
+        merged_rows = {}  # keyed by customer/project/task, in order of appearance
+        for timesheet, (timesheet_start, _) in zip(timesheets, periods):
+            offset = (timesheet_start - start_date).days
+            for _, key, row_fields, cells in timesheet._split_form_data():
+                merged_fields, merged_cells = merged_rows.setdefault(key, ({}, {}))
+                for k, v in row_fields.items():
+                    if not merged_fields.get(k):
+                        merged_fields[k] = v
+                for column_id, cell in cells.items():
+                    column_id += offset
+                    if column_id in merged_cells:
+                        cell = self._merge_cells(merged_cells[column_id], cell)
+                    merged_cells[column_id] = cell
+        return self._create_from_rows(
+            start_date, end_date, merged_rows.values(), options_from=timesheets
+        )
+
+    def slice(self, start_date, end_date):
+        """
+        Return a new timesheet containing only the entries between
+        `start_date` and `end_date` (inclusive). Raises `ValueError` if the
+        range doesn't overlap the timesheet period.
+        """
+        if "StartDate" not in self._form_data:
+            raise ValueError("expected timesheet to have a period to slice")
+        timesheet_start = parse_date_string(self._form_data["StartDate"])
+        timesheet_end = parse_date_string(self._form_data["EndDate"])
+        # Ignore any time of day, columns are whole days
+        midnight = dict(hour=0, minute=0, second=0, microsecond=0)
+        start_date = convert_to_datetime(start_date).replace(**midnight)
+        end_date = convert_to_datetime(end_date).replace(**midnight)
+        start_date = max(start_date, timesheet_start)
+        end_date = min(end_date, timesheet_end)
+        if start_date > end_date:
+            raise ValueError(
+                "expected slice to overlap timesheet period {} to {}".format(
+                    self._form_data["StartDate"], self._form_data["EndDate"]
+                )
+            )
+        first_column = (start_date - timesheet_start).days
+        last_column = (end_date - timesheet_start).days
+
+        rows = []
+        for _, _, row_fields, cells in self._split_form_data():
+            sliced_cells = dict(
+                (column_id - first_column, cell)
+                for column_id, cell in cells.items()
+                if first_column <= column_id <= last_column
+            )
+            rows.append((row_fields, sliced_cells))
+        return self._create_from_rows(start_date, end_date, rows)
+
     def extract_form_data_from_dict(self, data):
         # Get unique customer/project/task/description entries, these will become our rows
         unique_entries = set()
@@ -165,7 +498,7 @@ class Timesheet:
         # Generate range of dates from start to end date (to account for any missing dates in between)
         start_date = min(data.keys())
         end_date = max(data.keys())
-        timesheet_dates = generate_date_series(start_date, end_date)
+        timesheet_dates = iter_date_series(start_date, end_date)
 
         # Populate row entry, sum hours across multiple days into single row value
         for dt in timesheet_dates:
@@ -267,61 +600,23 @@ class Timesheet:
                     )
         return form_data
 
-    def date_entries(self):
+    def date_entries(self, filter=None):
         """
-        Construct dictionary of timesheet entries, with dates (`column_id` indexes) as keys.
+        Construct dictionary of timesheet entries, with dates as keys.
         """
         form_data = self._form_data
-        dates = {}
-        for k, v in form_data.items():
-            m = re.match(self.TIMESHEET_FIELD_PATTERN, k)
-            if not m:
-                continue
-            entry_type, row_id, column_id = m.groups()
-
-            # Only loop through FinishTime entries to assemble date entries
-            if entry_type != "FinishTime" or v == "0" or not v:
-                continue
-            row_id, column_id = int(row_id), int(column_id)
-            date_entries = dates.get(column_id, [])
-
-            # Lookup row
-            row_entry = self.row_entries().get(row_id)
-
-            entry = {
-                "hours": convert_time_string_and_minutes_to_hours(v) if v != "" else 0
-            }
-
-            # Check description list is populated (missing/empty when reading historical timesheets)
-            descriptions = row_entry.get("descriptions")
-            if descriptions:
-                entry.update({"description": descriptions[column_id]})
-
-            # Lookup customer/project/task details
-            customer = self.lookup_customer(row_entry.get("customer"))
-            project = self.lookup_project(row_entry.get("project"))
-            task = self.lookup_task(row_entry.get("task"))
-            entry.update(customer)
-            entry.update(project)
-            entry.update(task)
-
-            # Add entry under date
-            date_entries.append(entry)
-            dates[column_id] = date_entries
 
         # Generate range of dates from start to end date (to account for any missing dates in between)
-        start_date = dateparser(form_data["StartDate"])
-        end_date = dateparser(form_data["EndDate"])
-        timesheet_dates = generate_date_series(start_date, end_date)
-
-        # Match dates in timesheet period with ordinal index from `dates`
-        d = {}
-        for i, dt in enumerate(timesheet_dates):
-            d[dt] = dates.get(i, [])
+        start_date = parse_date_string(form_data["StartDate"])
+        end_date = parse_date_string(form_data["EndDate"])
+        d = dict((dt, []) for dt in iter_date_series(start_date, end_date))
+        for dt, entry in self.iter_entries(filter=filter):
+            if dt in d:
+                d[dt].append(entry)
         return d
 
-    def json(self):
-        date_entries = self.date_entries()
+    def json(self, filter=None):
+        date_entries = self.date_entries(filter=filter)
         return json.dumps(
             dict((k.strftime("%Y-%m-%d"), v) for k, v in date_entries.items()), indent=2
         )
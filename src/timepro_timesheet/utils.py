@@ -1,14 +1,62 @@
 from datetime import timedelta, date, datetime
+from functools import lru_cache
 
 from dateutil.parser import parse as dateparser
 
+MONTH_ABBREVIATIONS = dict(
+    (m, i + 1)
+    for i, m in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun"]
+        + ["jul", "aug", "sep", "oct", "nov", "dec"]
+    )
+)
+
+
+def iter_date_series(start_date, end_date):
+    """
+    Lazily generate series of dates from start to end date
+    """
+    days_diff = (end_date - start_date).days
+    for x in range(0, days_diff + 1):
+        yield start_date + timedelta(days=x)
+
 
 def generate_date_series(start_date, end_date):
     """
     Generate series of dates from start to end date
     """
-    days_diff = (end_date - start_date).days
-    return [start_date + timedelta(days=x) for x in range(0, days_diff + 1)]
+    return list(iter_date_series(start_date, end_date))
+
+
+def parse_date_string(date_string):
+    """
+    Parse dates in the formats used by TimePro (`%d-%b-%Y`) and our JSON
+    output (`%Y-%m-%d`) without the overhead of dateutil. Other formats are
+    passed to dateutil's parser.
+    """
+    try:
+        if len(date_string) == 10 and date_string[4] == "-" and date_string[7] == "-":
+            return datetime(
+                int(date_string[:4]), int(date_string[5:7]), int(date_string[8:])
+            )
+        if len(date_string) == 11 and date_string[2] == "-" and date_string[6] == "-":
+            month = MONTH_ABBREVIATIONS.get(date_string[3:6].lower())
+            if month:
+                return datetime(int(date_string[7:]), month, int(date_string[:2]))
+    except ValueError:
+        pass
+    return dateparser(date_string)
+
+
+def convert_to_datetime(value):
+    """
+    Convert a date, datetime or date string to a datetime
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return parse_date_string(value)
 
 
 def convert_keys_to_dates(data):
@@ -16,12 +64,18 @@ def convert_keys_to_dates(data):
     for k, d in data.items():
         key = k
         if not isinstance(key, date) and not isinstance(key, datetime):
-            key = dateparser(key)
+            key = parse_date_string(key)
         converted_data[key] = d
     return converted_data
 
 
+# Timesheets repeat a handful of values ("7.5", "8:00") across every cell
+@lru_cache(maxsize=1024)
 def convert_time_string_and_minutes_to_hours(time_string):
+    # Timesheets created from a data dictionary store hours as numbers
+    if isinstance(time_string, (int, float)):
+        return float(time_string)
+
     colon_count = time_string.count(":")
 
     if colon_count < 1:
@@ -0,0 +1,170 @@
+import hashlib
+import itertools
+import json
+import logging
+import time
+from datetime import timedelta
+
+from .api import WebsiteError
+
+logger = logging.getLogger(__name__)
+
+
+def split_period_into_weeks(start_date, end_date):
+    """
+    Split a period into a list of (start, end) tuples, one per Monday-Sunday week.
+    """
+    periods = []
+    while start_date <= end_date:
+        week_end = min(start_date + timedelta(days=6 - start_date.weekday()), end_date)
+        periods.append((start_date, week_end))
+        start_date = week_end + timedelta(days=1)
+    return periods
+
+
+def fingerprint_rows(timesheet):
+    """
+    Fingerprint the contents of each row in a timesheet. Returns a dictionary
+    of row keys (customer, project, task, occurrence) to a tuple of
+    fingerprint and row entry.
+    """
+    rows = {}
+    # Rows without hours aren't saved by TimePro and aren't yielded here, so
+    # they're treated as absent
+    row_cells = itertools.groupby(timesheet.iter_cells(), key=lambda c: c[0])
+    for _, cells in row_cells:
+        hours, descriptions = {}, {}
+        for _, dt, cell in cells:
+            dt = dt.strftime("%Y-%m-%d")
+            if cell["hours"]:
+                hours[dt] = cell["hours"]
+            if cell["description"]:
+                descriptions[dt] = cell["description"]
+        key = (cell["customer"], cell["project"], cell["task"])
+        entry = {
+            "customer": cell["customer"],
+            "project": cell["project"],
+            "task": cell["task"],
+            "hours": hours,
+            "descriptions": descriptions,
+        }
+        fingerprint = hashlib.sha1(
+            json.dumps(entry, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        # The same customer/project/task can appear on more than one row
+        occurrence = 0
+        while key + (occurrence,) in rows:
+            occurrence += 1
+        rows[key + (occurrence,)] = (fingerprint, entry)
+    return rows
+
+
+class TimesheetWatcher:
+    """
+    Poll one or more timesheet periods and emit events for entries that have
+    been added, changed or removed since the previous poll. Periods that stop
+    changing are polled less often, backing off up to `max_interval` seconds.
+
+    If a response doesn't contain a timesheet (e.g. the session has expired),
+    `relogin` is called, if given, before retrying once.
+    """
+
+    def __init__(
+        self,
+        api,
+        periods,
+        interval=300,
+        max_interval=3600,
+        backoff=2,
+        relogin=None,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        self.api = api
+        self.relogin = relogin
+        self.periods = list(periods)
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._clock = clock
+        self._sleep = sleep
+        self._rows = {}
+        self._intervals = dict((p, interval) for p in self.periods)
+        self._next_poll = dict((p, clock()) for p in self.periods)
+
+    def _period_info(self, period):
+        start_date, end_date = period
+        return {
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d"),
+        }
+
+    def poll(self, period):
+        """
+        Fetch the timesheet for a period and return a list of change events.
+        """
+        start_date, end_date = period
+        timesheet = self.api.get_timesheet(start_date=start_date, end_date=end_date)
+        timesheet_period = timesheet.period()
+        if timesheet_period is None and self.relogin:
+            self.relogin()
+            timesheet = self.api.get_timesheet(start_date=start_date, end_date=end_date)
+            timesheet_period = timesheet.period()
+        if timesheet_period is None:
+            raise WebsiteError("Timesheet not found in response.")
+        rows = fingerprint_rows(timesheet)
+        previous_rows = self._rows.get(period, {})
+        self._rows[period] = rows
+
+        period_info = self._period_info(period)
+        events = []
+        for key, (fingerprint, entry) in rows.items():
+            previous = previous_rows.get(key)
+            if previous is None:
+                event_type = "added"
+            elif previous[0] != fingerprint:
+                event_type = "changed"
+            else:
+                continue
+            events.append(dict(event=event_type, **period_info, **entry))
+        for key, (_, entry) in previous_rows.items():
+            if key not in rows:
+                events.append(dict(event="removed", **period_info, **entry))
+
+        self._schedule(period, changed=bool(events))
+        return events
+
+    def _schedule(self, period, changed):
+        # Back off polling for periods that aren't changing (or are failing)
+        if changed:
+            self._intervals[period] = self.interval
+        else:
+            self._intervals[period] = min(
+                self._intervals[period] * self.backoff, self.max_interval
+            )
+        self._next_poll[period] = self._clock() + self._intervals[period]
+
+    def run(self, callback, max_polls=None):
+        """
+        Poll periods as they become due, passing each event to `callback`.
+        Runs forever unless `max_polls` is given.
+        """
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            period = min(self.periods, key=lambda p: self._next_poll[p])
+            delay = self._next_poll[period] - self._clock()
+            if delay > 0:
+                self._sleep(delay)
+            polls += 1
+            try:
+                events = self.poll(period)
+            except Exception:
+                # Keep watching, previous rows are kept so nothing is "removed"
+                start_date, end_date = period
+                logger.exception(
+                    "Failed to poll timesheet for %s to %s", start_date, end_date
+                )
+                self._schedule(period, changed=False)
+                continue
+            for event in events:
+                callback(event)
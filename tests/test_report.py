@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from timepro_timesheet import report as report_module
+from timepro_timesheet.report import TimesheetReport, period_start
+from timepro_timesheet.timesheet import Timesheet
+
+
+def create_timesheet():
+    return Timesheet(
+        data={
+            "2018-08-06": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 8},
+                {"customer_code": "EX", "project_psid": "EX-2{:}1", "hours": 1},
+            ],
+            "2018-08-07": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 7.5}
+            ],
+            "2018-08-13": [
+                {"customer_code": "EX", "project_psid": "EX-2{:}1", "hours": 4}
+            ],
+        }
+    )
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def use_numpy(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(report_module, "np", None)
+    elif report_module.np is None:
+        pytest.skip("NumPy not installed")
+    return request.param
+
+
+def test_period_start():
+    dt = date(2018, 8, 8)
+    assert period_start(dt, "day") == dt
+    assert period_start(dt, "week") == date(2018, 8, 6)
+    assert period_start(dt, "month") == date(2018, 8, 1)
+    assert period_start(dt, "year") == date(2018, 1, 1)
+    with pytest.raises(ValueError):
+        period_start(dt, "fortnight")
+
+
+def test_report_group_by(use_numpy):
+    report = TimesheetReport.from_timesheets({"jdoe": create_timesheet()})
+    assert len(report) == 4
+    assert report.total() == 20.5
+    assert report.group_by("project") == [
+        {"project": "EX-1{:}1", "hours": 15.5},
+        {"project": "EX-2{:}1", "hours": 5.0},
+    ]
+    assert report.group_by(["staff", "customer"], period="week") == [
+        {"week": date(2018, 8, 6), "staff": "jdoe", "customer": "EX", "hours": 16.5},
+        {"week": date(2018, 8, 13), "staff": "jdoe", "customer": "EX", "hours": 4.0},
+    ]
+    with pytest.raises(ValueError):
+        report.group_by("hours")
+
+
+def test_report_pivot(use_numpy):
+    report = TimesheetReport.from_timesheets([create_timesheet()] * 2)
+    assert report.pivot("project", "date", period="week") == {
+        "EX-1{:}1": {date(2018, 8, 6): 31.0},
+        "EX-2{:}1": {date(2018, 8, 6): 2.0, date(2018, 8, 13): 8.0},
+    }
+
+
+def test_empty_report(use_numpy):
+    report = TimesheetReport()
+    assert report.total() == 0.0
+    assert report.group_by("project", period="month") == []
+
+
+def test_report_uses_column_dates(use_numpy):
+    # FinishTime field for 7 August is missing, later dates must not shift
+    timesheet = Timesheet()
+    timesheet._form_data = {
+        "StartDate": "06-Aug-2018",
+        "EndDate": "08-Aug-2018",
+        "CustomerCode_0_0": "EX",
+        "Project_0_0": "EX-1{:}1",
+        "FinishTime_0_0": "8",
+        "FinishTime_0_2": "4:30",
+    }
+    report = TimesheetReport.from_timesheets([timesheet])
+    assert report.group_by("date") == [
+        {"date": date(2018, 8, 6), "hours": 8.0},
+        {"date": date(2018, 8, 8), "hours": 4.5},
+    ]
+    assert report.group_by([], period="year") == [
+        {"year": date(2018, 1, 1), "hours": 12.5}
+    ]
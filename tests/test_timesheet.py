@@ -1,4 +1,14 @@
-from timepro_timesheet.utils import convert_time_string_and_minutes_to_hours
+from datetime import date, datetime
+
+import pytest
+
+from timepro_timesheet.timesheet import Timesheet
+from timepro_timesheet.utils import (
+    convert_time_string_and_minutes_to_hours,
+    generate_date_series,
+    iter_date_series,
+    parse_date_string,
+)
 
 
 def test_convert_time_string_and_minutes_to_hours():
@@ -14,3 +24,238 @@ def test_convert_time_string_and_minutes_to_hours():
         exception = e
 
     assert isinstance(exception, ValueError)
+
+
+def test_parse_date_string():
+    assert parse_date_string("06-Aug-2018") == datetime(2018, 8, 6)
+    assert parse_date_string("06-aug-2018") == datetime(2018, 8, 6)
+    assert parse_date_string("2018-08-06") == datetime(2018, 8, 6)
+    # Other formats fall back to dateutil
+    assert parse_date_string("6 August 2018") == datetime(2018, 8, 6)
+    assert parse_date_string("2018-08-06T09:30:00") == datetime(2018, 8, 6, 9, 30)
+
+
+def test_iter_date_series():
+    dates = iter_date_series(date(2018, 8, 30), date(2018, 9, 2))
+    assert next(dates) == date(2018, 8, 30)
+    assert list(dates) == [date(2018, 8, 31), date(2018, 9, 1), date(2018, 9, 2)]
+    assert generate_date_series(date(2018, 8, 6), date(2018, 8, 5)) == []
+
+
+def create_timesheet(data):
+    return Timesheet(
+        data=data,
+        project_options=[{"project_code": "EX-1", "project_psid": "EX-1{:}1"}],
+    )
+
+
+def test_timesheet_merge():
+    week_one = create_timesheet(
+        {
+            "2018-08-06": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 8}
+            ],
+            "2018-08-07": [
+                {
+                    "customer_code": "EX",
+                    "project_psid": "EX-1{:}1",
+                    "hours": 4,
+                    "description": "Design",
+                }
+            ],
+        }
+    )
+    week_two = create_timesheet(
+        {
+            "2018-08-07": [
+                {
+                    "customer_code": "EX",
+                    "project_psid": "EX-1{:}1",
+                    "hours": 3,
+                    "description": "Build",
+                }
+            ],
+            "2018-08-14": [
+                {"customer_code": "EX", "project_psid": "EX-2{:}1", "hours": 7.5}
+            ],
+        }
+    )
+    merged = week_one.merge(week_two)
+    form_data = merged.form_data()
+    assert form_data["StartDate"] == "06-Aug-2018"
+    assert form_data["EndDate"] == "14-Aug-2018"
+    assert merged.count_entries() == 2
+    assert merged._project_options is week_one._project_options
+
+    rows = sorted(merged.row_entries().values(), key=lambda r: r["project"])
+    assert rows[0]["project"] == "EX-1{:}1"
+    assert rows[0]["times"] == [8, 7, 0, 0, 0, 0, 0, 0, 0]
+    assert rows[0]["descriptions"][1] == "Design; Build"
+    assert rows[1]["times"][-1] == 7.5
+    assert sorted(merged.row_entries().keys()) == [0, 1]
+
+    # Overlapping timesheets are double-counted
+    doubled = week_one.merge(week_one)
+    assert doubled.row_entries()[0]["times"] == [16, 8]
+
+    with pytest.raises(ValueError):
+        Timesheet().merge(Timesheet())
+
+
+def test_timesheet_merge_zero_hours():
+    # TimePro can return "0" for days without hours, which mustn't hide hours
+    # from the other timesheet regardless of argument order
+    zero, hours = Timesheet(), Timesheet()
+    zero._form_data = {
+        "StartDate": "06-Aug-2018",
+        "EndDate": "07-Aug-2018",
+        "CustomerCode_0_0": "EX",
+        "Project_0_0": "EX-1{:}1",
+        "FinishTime_0_0": "0",
+        "Description_0_0": "",
+        "FinishTime_0_1": "4",
+        "Description_0_1": "Design",
+    }
+    hours._form_data = {
+        "StartDate": "06-Aug-2018",
+        "EndDate": "07-Aug-2018",
+        "CustomerCode_0_0": "EX",
+        "Project_0_0": "EX-1{:}1",
+        "FinishTime_0_0": "7:30",
+        "Description_0_0": "Build",
+        "FinishTime_0_1": "0:00",
+        "Description_0_1": "",
+    }
+    for merged in (zero.merge(hours), hours.merge(zero)):
+        row = merged.row_entries()[0]
+        assert row["times"] == [7.5, 4.0]
+        assert row["descriptions"] == ["Build", "Design"]
+
+
+def test_timesheet_slice():
+    timesheet = create_timesheet(
+        {
+            "2018-08-06": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 8}
+            ],
+            "2018-08-14": [
+                {"customer_code": "EX", "project_psid": "EX-2{:}1", "hours": 7.5}
+            ],
+        }
+    )
+    week_two = timesheet.slice(date(2018, 8, 13), "2018-08-19")
+    form_data = week_two.form_data()
+    assert form_data["StartDate"] == "13-Aug-2018"
+    assert form_data["EndDate"] == "14-Aug-2018"
+    assert week_two.row_entries() == {
+        0: {
+            "customer": "EX",
+            "project": "EX-2{:}1",
+            "task": "",
+            "times": [0, 7.5],
+            "descriptions": ["", ""],
+        }
+    }
+    assert week_two._project_options is timesheet._project_options
+    assert week_two.slice("2018-08-13", "2018-08-13").count_entries() == 0
+    # Times of day are ignored, the last day is kept
+    sliced = timesheet.slice("2018-08-06T12:00", datetime(2018, 8, 14, 9, 30))
+    assert sliced.form_data()["EndDate"] == "14-Aug-2018"
+    rows = dict((r["project"], r) for r in sliced.row_entries().values())
+    assert rows["EX-2{:}1"]["times"][-1] == 7.5
+    with pytest.raises(ValueError):
+        timesheet.slice("2018-09-01", "2018-09-05")
+    with pytest.raises(ValueError):
+        timesheet.slice("2018-08-10", "2018-08-08")
+
+
+def test_timesheet_iter_entries():
+    timesheet = create_timesheet(
+        {
+            "2018-08-06": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 8},
+                {"customer_code": "EX", "project_psid": "EX-2{:}1", "hours": 1},
+            ],
+            "2018-08-08": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 7.5}
+            ],
+        }
+    )
+    entries = timesheet.iter_entries(filter={"project": "EX-1"})
+    dt, entry = next(entries)
+    assert dt == datetime(2018, 8, 6)
+    assert entry == {
+        "hours": 8.0,
+        "description": "",
+        "project_code": "EX-1",
+        "project_psid": "EX-1{:}1",
+    }
+    assert [(dt, e["hours"]) for dt, e in entries] == [(datetime(2018, 8, 8), 7.5)]
+
+    entries = timesheet.iter_entries(
+        filter={"customer": ["EX"], "start_date": "2018-08-07"}
+    )
+    assert [(dt, e["hours"]) for dt, e in entries] == [(datetime(2018, 8, 8), 7.5)]
+
+    rows = timesheet.iter_rows(filter={"project": "EX-2{:}1"})
+    assert [entry["times"] for _, entry in rows] == [[1.0, 0, 0]]
+
+    with pytest.raises(ValueError):
+        list(timesheet.iter_entries(filter={"hours": 8}))
+
+
+def test_timesheet_iterators_are_lazy():
+    timesheet = Timesheet()
+    timesheet._form_data = {
+        "StartDate": "06-Aug-2018",
+        "EndDate": "07-Aug-2018",
+        "CustomerCode_0_0": "EX",
+        "Project_0_0": "EX-1{:}1",
+        "FinishTime_0_0": "8:00",
+        "FinishTime_0_1": "",
+        "CustomerCode_1_0": "EX",
+        "Project_1_0": "EX-2{:}1",
+        "FinishTime_1_0": "13:30:30",  # invalid, only fails if converted
+    }
+    dt, entry = next(timesheet.iter_entries())
+    assert (dt, entry["hours"]) == (datetime(2018, 8, 6), 8.0)
+    row_id, row = next(timesheet.iter_rows())
+    assert (row_id, row["times"]) == (0, [8.0, 0])
+    with pytest.raises(ValueError):
+        list(timesheet.iter_entries())
+
+    # Field index is cached until the form data is replaced
+    index = timesheet._index_fields()
+    assert timesheet._index_fields() is index
+    timesheet._form_data = dict(timesheet._form_data, FinishTime_1_0="1")
+    assert timesheet._index_fields() is not index
+    assert len(list(timesheet.iter_entries())) == 2
+
+
+def test_timesheet_iter_cells():
+    timesheet = Timesheet()
+    assert timesheet.period() is None
+    # FinishTime field for 7 August is missing, later dates must not shift
+    timesheet._form_data = {
+        "StartDate": "06-Aug-2018",
+        "EndDate": "08-Aug-2018",
+        "CustomerCode_0_0": "EX",
+        "Project_0_0": "EX-1{:}1",
+        "FinishTime_0_0": "8",
+        "Description_0_0": "Design",
+        "FinishTime_0_2": "4:30",
+        "CustomerCode_1_0": "EX",
+        "Project_1_0": "EX-2{:}1",
+        "FinishTime_1_0": "0",
+    }
+    assert timesheet.period() == (datetime(2018, 8, 6), datetime(2018, 8, 8))
+    cells = [(row_id, dt, c["hours"]) for row_id, dt, c in timesheet.iter_cells()]
+    assert cells == [(0, datetime(2018, 8, 6), 8.0), (0, datetime(2018, 8, 8), 4.5)]
+    _, _, cell = next(timesheet.iter_cells(filter={"end_date": "2018-08-06"}))
+    assert cell == {
+        "customer": "EX",
+        "project": "EX-1{:}1",
+        "task": "",
+        "hours": 8.0,
+        "description": "Design",
+    }
@@ -0,0 +1,130 @@
+from datetime import date
+
+from timepro_timesheet.timesheet import Timesheet
+from timepro_timesheet.watch import TimesheetWatcher, split_period_into_weeks
+
+
+class FakeAPI:
+    def __init__(self, data):
+        self.data = data
+        self.errors = []  # exceptions to raise (or pages to return) first
+
+    def get_timesheet(self, start_date=None, end_date=None):
+        if self.errors:
+            error = self.errors.pop(0)
+            if isinstance(error, Exception):
+                raise error
+            return error
+        return Timesheet(data=self.data)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_split_period_into_weeks():
+    assert split_period_into_weeks(date(2018, 8, 1), date(2018, 8, 14)) == [
+        (date(2018, 8, 1), date(2018, 8, 5)),
+        (date(2018, 8, 6), date(2018, 8, 12)),
+        (date(2018, 8, 13), date(2018, 8, 14)),
+    ]
+
+
+def test_watcher_emits_changes_and_backs_off():
+    api = FakeAPI(
+        {
+            "2018-08-06": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 8},
+                {"customer_code": "EX", "project_psid": "EX-2{:}1", "hours": 1},
+            ]
+        }
+    )
+    clock = FakeClock()
+    period = (date(2018, 8, 6), date(2018, 8, 12))
+    watcher = TimesheetWatcher(
+        api, [period], interval=10, max_interval=30, clock=clock, sleep=clock.sleep
+    )
+    events = []
+
+    watcher.run(events.append, max_polls=1)
+    events.sort(key=lambda e: e["project"])
+    assert [(e["event"], e["project"]) for e in events] == [
+        ("added", "EX-1{:}1"),
+        ("added", "EX-2{:}1"),
+    ]
+    assert events[0]["hours"] == {"2018-08-06": 8.0}
+    assert events[0]["start_date"] == "2018-08-06"
+
+    # Unchanged timesheet backs off polling up to `max_interval`
+    del events[:]
+    watcher.run(events.append, max_polls=3)
+    assert events == []
+    assert clock.now == 10 + 20 + 30
+
+    api.data = {
+        "2018-08-06": [{"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 7}]
+    }
+    watcher.run(events.append, max_polls=1)
+    assert [(e["event"], e["project"]) for e in events] == [
+        ("changed", "EX-1{:}1"),
+        ("removed", "EX-2{:}1"),
+    ]
+    assert events[0]["hours"] == {"2018-08-06": 7.0}
+    assert watcher._next_poll[period] == clock.now + 10
+
+
+def test_watcher_survives_failed_polls():
+    api = FakeAPI(
+        {
+            "2018-08-06": [
+                {"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 8}
+            ]
+        }
+    )
+    clock = FakeClock()
+    period = (date(2018, 8, 6), date(2018, 8, 12))
+    logins = []
+    watcher = TimesheetWatcher(
+        api,
+        [period],
+        interval=10,
+        max_interval=30,
+        relogin=lambda: logins.append(True),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    events = []
+    watcher.run(events.append, max_polls=1)
+    assert [e["event"] for e in events] == ["added"]
+
+    # Request errors are logged and the period backs off, without events
+    del events[:]
+    api.errors = [ConnectionError("connection reset")]
+    watcher.run(events.append, max_polls=1)
+    assert events == []
+    assert watcher._next_poll[period] == clock.now + 20
+
+    # A page without a timesheet (e.g. expired session) triggers a re-login
+    api.errors = [Timesheet()]
+    watcher.run(events.append, max_polls=1)
+    assert logins == [True]
+    assert events == []
+
+    # If the timesheet is still missing, the poll is skipped rather than
+    # reporting every row as removed
+    api.errors = [Timesheet(), Timesheet()]
+    watcher.run(events.append, max_polls=1)
+    assert events == []
+
+    api.data = {
+        "2018-08-06": [{"customer_code": "EX", "project_psid": "EX-1{:}1", "hours": 7}]
+    }
+    watcher.run(events.append, max_polls=1)
+    assert [e["event"] for e in events] == ["changed"]